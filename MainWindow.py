@@ -16,14 +16,35 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
 
         # base setup
         self.renderer, self.frame, self.vtk_widget, self.interactor, self.render_window = self.setup()
-        self.liver, self.mask = setup_liver(self.renderer, self.app.liver_FILE), setup_mask(self.renderer,
-                                                                                            self.app.MASK_FILE)
+        level = select_pyramid_level(self.app.liver_FILE, self.app.MASK_FILE)
+        self.liver = setup_liver(self.renderer, self.app.liver_FILE, level=level)
+        self.mask = setup_mask(self.renderer, self.app.MASK_FILE, level=level)
 
         # setup liver projection and slicer
         self.liver_image_prop = setup_projection(self.liver, self.renderer)
         self.liver_slicer_props = setup_slicer(self.renderer, self.liver)  # causing issues with rotation
+        self.mask_overlays, self.mask_overlay_lut = setup_mask_overlay(self.renderer, self.mask,
+                                                                       self.liver_slicer_props)
         self.slicer_widgets = []
 
+        # hover probe, throttled to the display refresh rate; the single shot timer always probes the last position
+        refresh_rate = self.app.primaryScreen().refreshRate() or 60.0  # 0 on virtual or headless screens
+        self.probe_position = (0, 0)
+        self.probe_timer = Qt.QTimer()
+        self.probe_timer.setSingleShot(True)
+        self.probe_timer.setInterval(int(1000 / refresh_rate))
+        self.probe_timer.timeout.connect(self.hover_probe)
+        self.interactor.AddObserver("MouseMoveEvent", self.hover_moved)
+
+        # a pyramid loaded volume is re-read for the slicer at the zoom the camera settles on
+        self.refine_timer = Qt.QTimer()
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(150)
+        self.refine_timer.timeout.connect(self.refine_slicer)
+        if self.liver.pyramid is not None:
+            self.interactor.GetInteractorStyle().AddObserver("EndInteractionEvent",
+                                                             lambda obj, event: self.refine_timer.start())
+
         # liver pickers
         self.liver_threshold_sp = self.create_new_picker(self.liver.scalar_range[1], self.liver.scalar_range[0], 5.0,
                                                          sum(self.liver.scalar_range) / 2, self.liver_threshold_vc)
@@ -85,6 +106,50 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         self.liver.image_mapper.Update()
         self.render_window.Render()
 
+    def hover_moved(self, obj, event):
+        self.probe_position = self.interactor.GetEventPosition()
+        if not self.probe_timer.isActive():
+            self.probe_timer.start()
+
+    def pick_label(self, candidates, ray):
+        # nearest visible mesh along the view ray
+        hit, hit_label = None, None
+        for label_id, label in candidates:
+            if label.actor and label.property.GetOpacity() > 0:
+                result = intersect_label(label, ray[0], ray[1])
+                if result and (hit is None or result[0] < hit[0]):
+                    hit, hit_label = result, label_id
+        return hit, hit_label
+
+    def hover_probe(self):
+        x, y = self.probe_position
+        ray = []
+        for depth in (0.0, 1.0):
+            self.renderer.SetDisplayPoint(x, y, depth)
+            self.renderer.DisplayToWorld()
+            point = self.renderer.GetWorldPoint()
+            ray.append([point[i] / point[3] for i in range(3)])
+
+        # the translucent liver surface encloses the mask meshes, so mask meshes take priority
+        hit, hit_label = self.pick_label([(i + 1, label) for i, label in enumerate(self.mask.labels)], ray)
+        if hit is None:
+            hit, hit_label = self.pick_label([(0, self.liver.labels[0])], ray)
+
+        if hit is None:
+            self.statusBar().clearMessage()
+            return
+
+        world = hit[1]
+        message = "World: ({0:.1f}, {1:.1f}, {2:.1f})".format(*world)
+        liver_voxel = probe_voxel(self.liver, world)
+        if liver_voxel:
+            message += "    Voxel: ({0}, {1}, {2})    Intensity: {3:.2f}".format(*liver_voxel[0], liver_voxel[1])
+        if not hit_label:
+            mask_voxel = probe_voxel(self.mask, world)
+            hit_label = int(mask_voxel[1]) if mask_voxel else 0
+        message += "    Label: {}".format(hit_label if hit_label else "none")
+        self.statusBar().showMessage(message)
+
     def add_liver_slicer(self):
         slicer_cb = QtWidgets.QCheckBox("Slicer")
         slicer_cb.clicked.connect(self.liver_slicer_vc)
@@ -147,20 +212,35 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         pos = self.slicer_widgets[0].value()
         self.liver_slicer_props[0].SetDisplayExtent(self.liver.extent[0], self.liver.extent[1], self.liver.extent[2],
                                                     self.liver.extent[3], pos, pos)
+        set_overlay_slice(self.mask_overlays[0], self.liver_slicer_props[0].GetDisplayExtent(), self.mask.extent)
+        if self.liver_slicer_cb.isChecked():
+            refine_slice(self.liver, self.liver_slicer_props[0], 2, self.renderer)
         self.render_window.Render()
 
     def coronal_slice_changed(self):
         pos = self.slicer_widgets[1].value()
         self.liver_slicer_props[1].SetDisplayExtent(self.liver.extent[0], self.liver.extent[1], pos, pos,
                                                     self.liver.extent[4], self.liver.extent[5])
+        set_overlay_slice(self.mask_overlays[1], self.liver_slicer_props[1].GetDisplayExtent(), self.mask.extent)
+        if self.liver_slicer_cb.isChecked():
+            refine_slice(self.liver, self.liver_slicer_props[1], 1, self.renderer)
         self.render_window.Render()
 
     def sagittal_slice_changed(self):
         pos = self.slicer_widgets[2].value()
         self.liver_slicer_props[2].SetDisplayExtent(pos, pos, self.liver.extent[2], self.liver.extent[3],
                                                     self.liver.extent[4], self.liver.extent[5])
+        set_overlay_slice(self.mask_overlays[2], self.liver_slicer_props[2].GetDisplayExtent(), self.mask.extent)
+        if self.liver_slicer_cb.isChecked():
+            refine_slice(self.liver, self.liver_slicer_props[2], 0, self.renderer)
         self.render_window.Render()
 
+    def refine_slicer(self):
+        if self.liver.pyramid is not None and self.liver_slicer_cb.isChecked():
+            self.axial_slice_changed()
+            self.coronal_slice_changed()
+            self.sagittal_slice_changed()
+
     def add_mask_settings_widget(self):
         mask_settings_group_box = QtWidgets.QGroupBox("Mask Settings")
         mask_settings_layout = QtWidgets.QGridLayout()
@@ -185,6 +265,9 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
             c_row = c_row + 1 if c_col == 1 else c_row
             c_col = 0 if c_col == 1 else 1
 
+        mask_settings_layout.addWidget(self.create_new_separator(), c_row, 0, 1, 2)
+        mask_settings_layout.addWidget(self.create_label_statistics_table(), c_row + 1, 0, 1, 2)
+
         mask_settings_group_box.setLayout(mask_settings_layout)
         self.grid.addWidget(mask_settings_group_box, 1, 0, 2, 2)
 
@@ -195,6 +278,26 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
             else:
                 cb.setDisabled(True)
 
+    def create_label_statistics_table(self):
+        headers = ["Label", "Voxels", "Volume (mm\u00b3)", "Centroid (x, y, z)", "X (min-max)", "Y (min-max)",
+                   "Z (min-max)"]
+        labels = [label for label in self.mask.labels if label.statistics and label.statistics['voxels']]
+        table = QtWidgets.QTableWidget(len(labels), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        for row, label in enumerate(labels):
+            stats = label.statistics
+            table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(stats['label'])))
+            table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(stats['voxels'])))
+            table.setItem(row, 2, QtWidgets.QTableWidgetItem("{:.1f}".format(stats['volume'])))
+            table.setItem(row, 3, QtWidgets.QTableWidgetItem("({:.1f}, {:.1f}, {:.1f})".format(*stats['centroid'])))
+            for axis in range(3):
+                low, high = stats['bounds'][2 * axis], stats['bounds'][2 * axis + 1]
+                table.setItem(row, 4 + axis, QtWidgets.QTableWidgetItem("{}-{}".format(low, high)))
+        table.resizeColumnsToContents()
+        return table
+
     def add_views_widget(self):
         axial_view = QtWidgets.QPushButton("Axial")
         coronal_view = QtWidgets.QPushButton("Coronal")
@@ -235,6 +338,10 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
                 self.mask.labels[i].property.SetOpacity(self.mask_opacity_sp.value())
             elif cb.isEnabled():  # labels without data are disabled
                 self.mask.labels[i].property.SetOpacity(0)
+            if cb.isEnabled():
+                r, g, b, _ = self.mask_overlay_lut.GetTableValue(i + 1)
+                self.mask_overlay_lut.SetTableValue(i + 1, r, g, b, 1.0 if cb.isChecked() else 0.0)
+        self.mask_overlay_lut.Modified()
         self.render_window.Render()
 
     def mask_single_color_radio_checked(self):
@@ -264,6 +371,9 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         self.liver_projection_cb.setDisabled(slicer_checked)  # disable projection checkbox, cant use both at same time
         for prop in self.liver_slicer_props:
             prop.GetProperty().SetOpacity(slicer_checked)
+        self.refine_slicer()
+        for _, overlay, _ in self.mask_overlays:
+            overlay.GetProperty().SetOpacity(MASK_OVERLAY_OPACITY if slicer_checked else 0)
         self.render_window.Render()
 
     def liver_opacity_vc(self):
@@ -307,6 +417,7 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         self.renderer.GetActiveCamera().SetViewUp(0.0, 1.0, 0.0)
         self.renderer.GetActiveCamera().Zoom(1.8)
         self.render_window.Render()
+        self.refine_timer.start()
 
     def set_coronal_view(self):
         self.renderer.ResetCamera()
@@ -317,6 +428,7 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         self.renderer.GetActiveCamera().SetViewUp(0.0, 0.5, 0.5)
         self.renderer.GetActiveCamera().Zoom(1.8)
         self.render_window.Render()
+        self.refine_timer.start()
 
     def set_sagittal_view(self):
         self.renderer.ResetCamera()
@@ -327,6 +439,7 @@ class MainWindow(QtWidgets.QMainWindow, QtWidgets.QApplication):
         self.renderer.GetActiveCamera().SetViewUp(0.0, 0.0, 1.0)
         self.renderer.GetActiveCamera().Zoom(1.6)
         self.render_window.Render()
+        self.refine_timer.start()
 
     @staticmethod
     def create_new_separator():
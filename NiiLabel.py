@@ -3,6 +3,10 @@ class NiiLabel:
         self.actor = None
         self.property = None
         self.smoother = None
+        self.pruner = None
+        self.statistics = None
+        self.locator = None
+        self.locator_time = 0
         self.color = color
         self.opacity = opacity
         self.smoothness = smoothness
@@ -1,7 +1,12 @@
 class NiiObject:
     def __init__(self):
         self.file = None
+        self.array = None
+        self.pyramid = None
+        self.level = 0
+        self.refined = {}
         self.reader = None
+        self.pruned = None
         self.extent = ()
         self.labels = []
         self.image_mapper = None
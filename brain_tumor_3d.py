@@ -27,8 +27,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Reads Nii.gz Files and renders them in 3D.')
     parser.add_argument('-i', type=lambda fn: verify_type(fn), help='an mri scan (nii.gz)')
     parser.add_argument('-m', type=lambda fn: verify_type(fn), help='the segmentation mask (nii.gz)')
+    parser.add_argument('-s', help='write per-label statistics of the mask to this csv file and exit')
     args = parser.parse_args()
 
+    if args.s:
+        if not args.m:
+            parser.error("-s requires a segmentation mask (-m)")
+        mask = NiiObject()
+        load_volume(mask, args.m)
+        n_labels = min(int(mask.reader.GetOutput().GetScalarRange()[1]), 10)
+        write_label_statistics(args.s, compute_mask_statistics(mask, n_labels))
+        sys.exit(0)
+
     redirect_vtk_messages()
     app = QtWidgets.QApplication(sys.argv)
 
@@ -3,6 +3,8 @@ APPLICATION_TITLE = "Theia – NIfTI (nii.gz) 3D Visualizer"
 LIVER_SMOOTHNESS = 500
 LIVER_OPACITY = 0.2
 LIVER_COLORS = [(1.0, 0.9, 0.9)]  # RGB percentages
+LIVER_MIN_REGION_CELLS = 0  # drop surface components with fewer triangles than this before smoothing (0 keeps all)
+LIVER_MAX_REGIONS = 0  # keep only the N largest surface components (0 keeps all)
 
 # default mask settings
 MASK_SMOOTHNESS = 500
@@ -16,3 +18,10 @@ MASK_COLORS = [(1, 0, 0),
                 (0.5, 1, 0.5),
                 (0.5, 0.5, 1)]  # RGB percentages
 MASK_OPACITY = 1.0
+MASK_MIN_REGION_VOXELS = 0  # per label, drop connected components smaller than this (0 keeps all)
+MASK_MAX_REGIONS = 0  # per label, keep only the N largest components (0 keeps all)
+MASK_OVERLAY_OPACITY = 0.5  # opacity of the label overlay on the slicer
+
+# large volume settings
+VOLUME_MEMORY_BUDGET = 2 * 1024 ** 3  # bytes the scan and mask may use together before a pyramid level is used
+PYRAMID_LEVELS = 3  # on-disk levels at 1/2, 1/4, 1/8 resolution
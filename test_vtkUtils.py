@@ -0,0 +1,301 @@
+import nibabel as nib
+import numpy as np
+import pytest
+import vtk
+
+import vtkUtils
+from NiiLabel import NiiLabel
+from NiiObject import NiiObject
+from vtkUtils import (build_pyramid, compute_label_statistics, create_surface_pruner, get_label_locator,
+                      image_to_array, import_volume, intersect_label, load_volume, probe_voxel, prune_mask,
+                      refine_slice, set_overlay_slice, setup_mask_overlay, slice_region, view_level)
+
+
+def make_mask():
+    mask = np.zeros((5, 6, 7), dtype=np.uint8, order='F')  # [x, y, z]
+    mask[1:3, 2, 3:5] = 1
+    mask[4, 5, 6] = 2
+    return mask
+
+
+def test_label_statistics():
+    stats = compute_label_statistics(make_mask(), 3, (2.0, 1.0, 0.5))
+
+    assert [s['voxels'] for s in stats] == [4, 1, 0]
+    assert stats[0]['volume'] == pytest.approx(4.0)
+    assert stats[0]['centroid'] == pytest.approx((3.0, 2.0, 1.75))
+    assert stats[0]['bounds'] == (1, 2, 2, 2, 3, 4)
+    assert stats[1]['bounds'] == (4, 4, 5, 5, 6, 6)
+    assert stats[2]['centroid'] is None and stats[2]['bounds'] is None
+
+
+def test_label_statistics_ignores_out_of_range_values():
+    mask = make_mask().astype(np.int16)
+    mask[0, 0, 0] = -1
+    mask[0, 0, 1] = 12
+    stats = compute_label_statistics(mask, 2, (1.0, 1.0, 1.0))
+    assert [s['voxels'] for s in stats] == [4, 1]
+
+
+def test_label_statistics_dense_and_sparse_slabs_agree():
+    rng = np.random.default_rng(0)
+    dense = rng.integers(0, 4, size=(9, 8, 70), dtype=np.uint8)  # spans several slabs
+    sparse = np.where(rng.random(dense.shape) < 0.02, dense, 0).astype(np.uint8)
+    for mask in (dense, sparse):
+        stats = compute_label_statistics(mask, 3, (1.0, 1.0, 1.0))
+        for s in stats:
+            x, y, z = np.nonzero(mask == s['label'])
+            assert s['voxels'] == x.size
+            assert s['centroid'] == pytest.approx((x.mean(), y.mean(), z.mean()))
+            assert s['bounds'] == (x.min(), x.max(), y.min(), y.max(), z.min(), z.max())
+
+
+def test_label_statistics_streams_nibabel_proxy(tmp_path):
+    mask = np.zeros((6, 5, 70), dtype=np.uint8)
+    mask[1:4, 1:3, 10:60] = 1
+    file_name = str(tmp_path / "mask.nii.gz")
+    nib.save(nib.Nifti1Image(mask, np.diag([0.5, 0.5, 2.0, 1.0])), file_name)
+
+    proxy = nib.load(file_name, keep_file_open=True).dataobj
+    stats = compute_label_statistics(proxy, 1, (0.5, 0.5, 2.0))
+    assert stats == compute_label_statistics(mask, 1, (0.5, 0.5, 2.0))
+    assert stats[0]['volume'] == pytest.approx(300 * 0.5)
+
+
+def test_import_round_trip_shares_memory():
+    array = np.asfortranarray(np.arange(60, dtype=np.int16).reshape(3, 4, 5))
+    importer = import_volume(array, affine=np.diag([0.5, 1.0, 2.0, 1.0]))
+    view = image_to_array(importer.GetOutput()).T
+    np.testing.assert_array_equal(view, array)
+    assert np.shares_memory(view, array)
+    assert importer.GetOutput().GetSpacing() == (0.5, 1.0, 2.0)
+
+
+def test_import_bool_mask():
+    mask = make_mask().astype(bool)
+    view = image_to_array(import_volume(mask).GetOutput()).T
+    assert view.dtype == np.uint8
+    np.testing.assert_array_equal(view, mask)
+
+
+def test_import_float16_and_unsupported_dtypes():
+    view = image_to_array(import_volume(np.ones((2, 2, 2), dtype=np.float16)).GetOutput())
+    assert view.dtype == np.float32
+    with pytest.raises(TypeError):
+        import_volume(np.zeros((2, 2, 2), dtype=np.complex64))
+
+
+def save_nifti(tmp_path, array, name="volume.nii.gz"):
+    file_name = str(tmp_path / name)
+    nib.save(nib.Nifti1Image(array, np.eye(4)), file_name)
+    return file_name
+
+
+def test_pyramid_odd_shapes(tmp_path):
+    array = np.arange(7 * 5 * 3, dtype=np.int16).reshape(7, 5, 3)
+    levels = build_pyramid(save_nifti(tmp_path, array), 3)
+    assert [level.shape[:3] for level in levels] == [(7, 5, 3), (4, 3, 2), (2, 2, 1), (1, 1, 1)]
+    np.testing.assert_array_equal(levels[1], array[::2, ::2, ::2])
+    np.testing.assert_array_equal(levels[2], array[::4, ::4, ::4])
+
+
+def test_label_pyramid_keeps_small_labels(tmp_path):
+    mask = np.zeros((9, 9, 9), dtype=np.uint8)
+    mask[3, 5, 7] = 2  # a one voxel lesion on odd coordinates, which striding drops
+    levels = build_pyramid(save_nifti(tmp_path, mask), 3, labels=True)
+    assert [int(level.max()) for level in levels[1:]] == [2, 2, 2]
+    assert levels[1][1, 2, 3] == 2
+
+
+def test_pyramid_falls_back_to_user_cache(tmp_path, monkeypatch):
+    file_name = save_nifti(tmp_path, np.zeros((4, 4, 4), dtype=np.uint8))
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setattr(vtkUtils.os, "access", lambda path, mode: False)  # dataset directory is read-only
+    build_pyramid(file_name, 1)
+    assert list((tmp_path / "home" / ".cache" / "theia").glob("*/level_1.npy"))
+
+
+def test_view_level_and_slice_region():
+    assert view_level((1.0, 1.0, 2.0), 0.5, 3) == 0
+    assert view_level((1.0, 1.0, 2.0), 4.5, 3) == 2
+    assert view_level((1.0, 1.0, 2.0), 100.0, 3) == 3
+    region = slice_region((100, 80, 60), (1.0, 1.0, 1.0), 2, 30, [10.2, 20.5, -5.0, 200.0, 0.0, 0.0])
+    assert region == [(10, 21), (0, 79), (30, 30)]
+
+
+def test_refine_slice_reads_visible_region_at_full_resolution(tmp_path):
+    array = np.arange(64 * 64 * 16, dtype=np.int16).reshape(64, 64, 16, order='F')
+    liver = NiiObject()
+    load_volume(liver, save_nifti(tmp_path, array), level=2)
+    liver.image_mapper = vtk.vtkImageMapToColors()
+    liver.image_mapper.SetInputConnection(liver.reader.GetOutputPort())
+    liver.image_mapper.SetLookupTable(vtk.vtkLookupTable())
+
+    window = vtk.vtkRenderWindow()
+    window.SetOffScreenRendering(1)
+    window.SetSize(400, 400)
+    renderer = vtk.vtkRenderer()
+    window.AddRenderer(renderer)
+    camera = renderer.GetActiveCamera()
+    camera.SetFocalPoint(20.0, 20.0, 8.0)
+    camera.SetPosition(20.0, 20.0, 28.0)  # 20 units away: about 0.04 units per pixel, so level 0
+
+    axial = vtk.vtkImageActor()
+    axial.SetDisplayExtent(0, 15, 0, 15, 1, 1)  # level 2 index of full resolution slice 4
+    refine_slice(liver, axial, 2, renderer)
+
+    importer, _ = liver.refined[2]
+    image = importer.GetOutput()
+    assert image.GetSpacing() == (1.0, 1.0, 1.0)
+    view = image_to_array(image).T
+    x0, y0 = (int(round(image.GetOrigin()[i])) for i in range(2))
+    assert image.GetOrigin()[2] == 4.0 and view.shape[2] == 1
+    assert view.shape[0] < 64 or x0 > 0  # only the on-screen part is read
+    np.testing.assert_array_equal(view[:, :, 0], array[x0:x0 + view.shape[0], y0:y0 + view.shape[1], 4])
+
+
+def test_probe_voxel():
+    array = np.asfortranarray(np.arange(60, dtype=np.int16).reshape(3, 4, 5))
+    volume = NiiObject()
+    load_volume(volume, array, affine=np.diag([2.0, 1.0, 1.0, 1.0]))
+    assert probe_voxel(volume, (3.9, 1.2, 4.4)) == ((2, 1, 4), int(array[2, 1, 4]))
+    assert probe_voxel(volume, (0.0, 0.0, 5.6)) is None
+
+
+def test_probe_voxel_reports_full_resolution_index(tmp_path):
+    array = np.arange(8 * 8 * 8, dtype=np.int16).reshape(8, 8, 8)
+    volume = NiiObject()
+    load_volume(volume, save_nifti(tmp_path, array), level=1)
+    assert probe_voxel(volume, (6.0, 2.0, 4.0)) == ((6, 2, 4), int(array[6, 2, 4]))
+
+
+def make_sphere_label(resolution):
+    sphere = vtk.vtkSphereSource()
+    sphere.SetRadius(1.0)
+    sphere.SetThetaResolution(resolution)
+    sphere.SetPhiResolution(resolution)
+    mapper = vtk.vtkPolyDataMapper()
+    mapper.SetInputConnection(sphere.GetOutputPort())
+    sphere.Update()
+    label = NiiLabel((1.0, 0.0, 0.0), 1.0, 0)
+    label.actor = vtk.vtkActor()
+    label.actor.SetMapper(mapper)
+    return sphere, label
+
+
+def test_intersect_label():
+    _, label = make_sphere_label(32)
+    t, x = intersect_label(label, (-5.0, 0.0, 0.0), (5.0, 0.0, 0.0))
+    assert t == pytest.approx(0.4, abs=0.01)
+    assert x == pytest.approx((-1.0, 0.0, 0.0), abs=0.01)
+    assert intersect_label(label, (-5.0, 3.0, 0.0), (5.0, 3.0, 0.0)) is None
+
+
+def test_label_locator_is_rebuilt_after_mesh_changes():
+    sphere, label = make_sphere_label(8)
+    locator = get_label_locator(label)
+    assert get_label_locator(label) is locator
+
+    sphere.SetRadius(2.0)
+    sphere.Update()
+    assert get_label_locator(label) is not locator
+    t, x = intersect_label(label, (-5.0, 0.0, 0.0), (5.0, 0.0, 0.0))
+    assert x[0] == pytest.approx(-2.0, abs=0.1)
+
+
+def make_component_mask():
+    mask = np.zeros((12, 12, 12), dtype=np.uint8, order='F')
+    mask[0:2, 0:2, 0:2] = 1  # 8 voxels
+    mask[5, 0, 0:3] = 1  # 3 voxels
+    mask[9, 0, 0] = 1  # 1 voxel
+    mask[0, 6, 0:5] = 2  # 5 voxels
+    mask[0, 10, 0:2] = 2  # 2 voxels
+    return mask
+
+
+@pytest.mark.parametrize("min_voxels, max_regions, kept", [
+    (3, 0, [(1, 8), (1, 3), (2, 5)]),
+    (0, 1, [(1, 8), (2, 5)]),
+    (3, 1, [(1, 8), (2, 5)]),
+    (2, 2, [(1, 8), (1, 3), (2, 5), (2, 2)]),
+])
+def test_prune_mask(monkeypatch, min_voxels, max_regions, kept):
+    monkeypatch.setattr(vtkUtils, "MASK_MIN_REGION_VOXELS", min_voxels)
+    monkeypatch.setattr(vtkUtils, "MASK_MAX_REGIONS", max_regions)
+    source = make_component_mask()
+    mask = NiiObject()
+    mask.reader = import_volume(source, origin=(1.0, 2.0, 3.0))
+    prune_mask(mask, 2)
+
+    image = mask.pruned.GetOutput()
+    assert image.GetOrigin() == (1.0, 2.0, 3.0)
+    pruned = image_to_array(image).T
+    regions = {(1, 8): (slice(0, 2), slice(0, 2), slice(0, 2)), (1, 3): (5, 0, slice(0, 3)), (1, 1): (9, 0, 0),
+               (2, 5): (0, 6, slice(0, 5)), (2, 2): (0, 10, slice(0, 2))}
+    expected = np.zeros_like(source)
+    for key in kept:
+        expected[regions[key]] = key[0]
+    np.testing.assert_array_equal(pruned, expected)
+
+
+def test_mask_footprint_bytes(monkeypatch):
+    assert vtkUtils.mask_footprint_bytes() == 0
+    monkeypatch.setattr(vtkUtils, "MASK_MIN_REGION_VOXELS", 10)
+    assert vtkUtils.mask_footprint_bytes() == 3
+    monkeypatch.setattr(vtkUtils, "MASK_MAX_REGIONS", 2)
+    assert vtkUtils.mask_footprint_bytes() == 4
+
+
+def make_spheres(resolutions):
+    append = vtk.vtkAppendPolyData()
+    cells = []
+    for i, resolution in enumerate(resolutions):
+        sphere = vtk.vtkSphereSource()
+        sphere.SetCenter(3.0 * i, 0.0, 0.0)
+        sphere.SetThetaResolution(resolution)
+        sphere.SetPhiResolution(resolution)
+        sphere.Update()
+        cells.append(sphere.GetOutput().GetNumberOfCells())
+        append.AddInputConnection(sphere.GetOutputPort())
+    return append, cells
+
+
+@pytest.mark.parametrize("min_cells, max_regions, kept", [
+    (0, 0, [0, 1, 2]),
+    (100, 0, [0, 2]),
+    (0, 1, [2]),
+    (100, 1, [2]),
+    (100000, 0, []),
+])
+def test_surface_pruner(min_cells, max_regions, kept):
+    append, cells = make_spheres([16, 4, 32])
+    assert cells[1] < 100 < cells[0] < cells[2]
+    pruner = create_surface_pruner(append, min_cells, max_regions)
+    pruner.Update()
+    assert pruner.GetOutput().GetNumberOfCells() == sum(cells[i] for i in kept)
+
+
+def test_overlay_follows_one_slice_and_hides_outside_the_mask():
+    source = np.asfortranarray(np.arange(6 * 5 * 4, dtype=np.uint8).reshape(6, 5, 4) % 3)
+    mask = NiiObject()
+    load_volume(mask, source)
+    mask.extent = mask.reader.GetOutput().GetExtent()
+    props = [vtk.vtkImageActor() for _ in range(3)]
+    props[0].SetDisplayExtent(0, 9, 0, 9, 1, 1)  # the liver is larger than the mask
+    props[1].SetDisplayExtent(0, 9, 3, 3, 0, 9)
+    props[2].SetDisplayExtent(8, 8, 0, 9, 0, 9)
+    overlays, _ = setup_mask_overlay(vtk.vtkRenderer(), mask, props)
+
+    voi, actor, _ = overlays[0]
+    set_overlay_slice(overlays[0], (0, 9, 0, 9, 2, 2), mask.extent)
+    voi.Update()
+    assert voi.GetOutput().GetExtent() == (0, 5, 0, 4, 2, 2)
+    assert actor.GetDisplayExtent() == (0, 5, 0, 4, 2, 2) and actor.GetVisibility()
+    np.testing.assert_array_equal(image_to_array(voi.GetOutput()).T[:, :, 0], source[:, :, 2])
+
+    set_overlay_slice(overlays[0], (0, 9, 0, 9, 7, 7), mask.extent)
+    assert not actor.GetVisibility()
+    assert voi.GetVOI() == (0, 5, 0, 4, 2, 2)
+
+    assert overlays[1][0].GetVOI() == (0, 5, 3, 3, 0, 3) and overlays[1][1].GetVisibility()
+    assert not overlays[2][1].GetVisibility()  # sagittal slice 8 is outside the mask
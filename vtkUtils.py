@@ -1,4 +1,11 @@
+import csv
+import hashlib
+import os
+
+import nibabel as nib
+import numpy as np
 import vtk
+from vtk.util import numpy_support
 from ErrorObserver import *
 from NiiObject import *
 from config import *
@@ -18,18 +25,382 @@ def read_volume(file_name):
     return reader
 
 
+def import_volume(array, affine=None, spacing=None, origin=(0.0, 0.0, 0.0)):
+    # share an [x, y, z] array (nibabel's layout) with VTK; only non Fortran ordered arrays are copied
+    # the importer must not execute twice: VTK then keeps the buffer but reports a single scalar
+    if array.dtype == np.bool_:
+        array = array.view(np.uint8)
+    elif array.dtype == np.float16:
+        array = array.astype(np.float32)  # VTK has no half precision type
+    elif array.dtype.kind not in 'iuf':
+        raise TypeError("Unsupported volume dtype: {}".format(array.dtype))
+    if not array.dtype.isnative:
+        array = array.astype(array.dtype.newbyteorder('='))
+    if spacing is None:
+        spacing = np.linalg.norm(np.asarray(affine)[:3, :3], axis=0) if affine is not None else (1.0, 1.0, 1.0)
+    flat = np.ravel(array, order='F')  # VTK stores x fastest, which is Fortran order for [x, y, z]
+
+    importer = vtk.vtkImageImport()
+    importer.SetImportVoidPointer(flat, 1)  # 1: VTK must not free memory owned by NumPy
+    importer.SetDataScalarType(numpy_support.get_vtk_array_type(flat.dtype))
+    importer.SetNumberOfScalarComponents(1)
+    extent = (0, array.shape[0] - 1, 0, array.shape[1] - 1, 0, array.shape[2] - 1)
+    importer.SetDataExtent(extent)
+    importer.SetWholeExtent(extent)
+    importer.SetDataSpacing(*[float(s) for s in spacing])
+    importer.SetDataOrigin(*[float(o) for o in origin])
+    importer.Update()
+    importer.array = flat  # keep the shared buffer referenced by the importer
+    return importer
+
+
+def volume_footprint(shape, dtype, extra_bytes=4):
+    # scalars plus per voxel copies; the default 4 is the RGBA copy vtkImageMapToColors makes for the slicer
+    return int(np.prod(shape, dtype=np.int64)) * (np.dtype(dtype).itemsize + extra_bytes)
+
+
+def file_footprint(file_name, level=0, extra_bytes=4):
+    header = nib.load(file_name).header
+    shape = [-(-n // 2 ** level) for n in header.get_data_shape()[:3]]  # each level halves, rounding up
+    return volume_footprint(shape, header.get_data_dtype(), extra_bytes)
+
+
+def select_pyramid_level(liver_file, mask_file, memory_budget=VOLUME_MEMORY_BUDGET):
+    # one level for both volumes so their voxel indices stay aligned for the slicer overlay
+    for level in range(PYRAMID_LEVELS + 1):
+        if file_footprint(liver_file, level) + file_footprint(mask_file, level, mask_footprint_bytes()) <= memory_budget:
+            return level
+    return PYRAMID_LEVELS
+
+
+def pyramid_directory(file_name):
+    # next to the file when possible, otherwise in the user cache (read-only dataset storage)
+    directory = file_name + '.pyramid'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        if os.access(directory, os.W_OK):
+            return directory
+    except OSError:
+        pass
+    key = hashlib.sha1(os.path.abspath(file_name).encode()).hexdigest()
+    directory = os.path.join(os.path.expanduser('~'), '.cache', 'theia', key)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def downsample_block(block, labels):
+    # 2x2x2 reduction of a z slab; max pooling keeps thin and small labels that striding would drop
+    if not labels:
+        return block[::2, ::2, ::2]
+    block = np.pad(block, [(0, n % 2) for n in block.shape], mode='edge')
+    nx, ny, nz = block.shape
+    return block.reshape(nx // 2, 2, ny // 2, 2, nz // 2, 2).max(axis=(1, 3, 5))
+
+
+def build_pyramid(file_name, n_levels=PYRAMID_LEVELS, labels=False):
+    # [nibabel proxy, 1/2, 1/4, ...]; levels are Fortran ordered .npy files built once, slab by slab
+    image = nib.load(file_name, keep_file_open=True)  # a .nii.gz is otherwise decompressed again for every slab
+    levels = [image.dataobj]
+    dtype = np.asarray(image.dataobj[:1, :1, :1]).dtype
+    directory = pyramid_directory(file_name)
+
+    for level in range(1, n_levels + 1):
+        path = os.path.join(directory, 'level_{}{}.npy'.format(level, '_max' if labels else ''))
+        source = levels[-1]
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(file_name):
+            shape = tuple((n + 1) // 2 for n in source.shape[:3])
+            target = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=dtype, shape=shape, fortran_order=True)
+            slab = 64  # must be even so every slab starts on a block boundary
+            for z in range(0, source.shape[2], slab):
+                block = downsample_block(np.asarray(source[:, :, z:z + slab]), labels)
+                target[:, :, z // 2:z // 2 + block.shape[2]] = block
+            target.flush()
+            del target
+            os.replace(path + '.tmp', path)
+        levels.append(np.load(path, mmap_mode='c'))  # copy-on-write keeps the buffer writable for vtkImageImport
+    return levels
+
+
+def view_level(spacing, pixel_size, max_level):
+    # coarsest level whose voxels are still no larger than a screen pixel
+    level = int(np.floor(np.log2(max(pixel_size / min(spacing), 1.0))))
+    return min(level, max_level)
+
+
+def slice_region(shape, spacing, axis, index, window):
+    # voxel bounds [lo, hi] per axis of the slice at index on axis, limited to the world window on screen
+    region = []
+    for i in range(3):
+        if i == axis:
+            region.append((index, index))
+            continue
+        lo = max(int(np.floor(window[2 * i] / spacing[i])), 0)
+        hi = min(int(np.ceil(window[2 * i + 1] / spacing[i])), shape[i] - 1)
+        region.append((lo, hi))
+    return region
+
+
+def view_window(renderer):
+    # world size of a screen pixel and a focal point centred box holding everything on screen
+    camera = renderer.GetActiveCamera()
+    width, height = renderer.GetSize()
+    if camera.GetParallelProjection():
+        view_height = 2 * camera.GetParallelScale()
+    else:
+        view_height = 2 * camera.GetDistance() * np.tan(np.radians(camera.GetViewAngle()) / 2)
+    pixel_size = view_height / max(height, 1)
+    half = pixel_size * max(width, height)  # twice the focal plane window, for slices in front of it
+    focal = camera.GetFocalPoint()
+    return pixel_size, [focal[i // 2] + (half if i % 2 else -half) for i in range(6)]
+
+
+def refine_slice(nii_object, slicer_prop, axis, renderer):
+    # show the displayed slice of a pyramid loaded volume from the finest level the zoom can resolve,
+    # reading only the part that is on screen; the prop's display extent must be in loaded level indices
+    if nii_object.pyramid is None:
+        return
+    extent = slicer_prop.GetDisplayExtent()
+    spacing = [s / 2 ** nii_object.level for s in nii_object.reader.GetOutput().GetSpacing()]
+    pixel_size, window = view_window(renderer)
+    level = view_level(spacing, pixel_size, nii_object.level)
+    level_spacing = [s * 2 ** level for s in spacing]
+    source = nii_object.pyramid[level]
+    index = min(extent[2 * axis] * 2 ** (nii_object.level - level), source.shape[axis] - 1)
+    region = slice_region(source.shape[:3], level_spacing, axis, index, window)
+    if level == nii_object.level or any(lo > hi for lo, hi in region):
+        # the loaded level is fine enough, or nothing of the slice is on screen
+        slicer_prop.GetMapper().SetInputConnection(nii_object.image_mapper.GetOutputPort())
+        nii_object.refined.pop(axis, None)
+        return
+
+    array = np.asfortranarray(source[tuple(slice(lo, hi + 1) for lo, hi in region)])
+
+    importer = import_volume(array, spacing=level_spacing, origin=[region[i][0] * level_spacing[i] for i in range(3)])
+    colors = vtk.vtkImageMapToColors()
+    colors.SetInputConnection(importer.GetOutputPort())
+    colors.SetLookupTable(nii_object.image_mapper.GetLookupTable())
+    slicer_prop.GetMapper().SetInputConnection(colors.GetOutputPort())
+    slicer_prop.SetDisplayExtent(importer.GetDataExtent())
+    nii_object.refined[axis] = (importer, colors)  # keeps the imported array alive
+
+
+def load_volume(nii_object, source, affine=None, level=0, labels=False):
+    # source is either a nii.gz file name or an in-memory NumPy array; level > 0 loads that pyramid level of a file
+    if isinstance(source, np.ndarray):
+        nii_object.array = source
+        nii_object.reader = import_volume(source, affine)
+        return nii_object.reader
+
+    nii_object.file = source
+    if not level:
+        nii_object.reader = read_volume(source)
+        return nii_object.reader
+
+    nii_object.pyramid = build_pyramid(source, level, labels)
+    nii_object.level = level
+    nii_object.array = nii_object.pyramid[level]
+    zooms = nib.load(source).header.get_zooms()[:3]
+    nii_object.reader = import_volume(nii_object.array, spacing=[s * 2 ** level for s in zooms])
+    return nii_object.reader
+
+
+def image_to_array(image):
+    # zero-copy [z, y, x] view of the image scalars, .T gives nibabel's [x, y, z]; the image must outlive it
+    extent = image.GetExtent()
+    shape = (extent[5] - extent[4] + 1, extent[3] - extent[2] + 1, extent[1] - extent[0] + 1)
+    scalars = numpy_support.vtk_to_numpy(image.GetPointData().GetScalars())
+    return scalars.reshape(shape)
+
+
+def label_histograms(volume, n_labels, slab=32):
+    # per-axis label histograms of an [x, y, z] array or nibabel proxy, streamed in z slabs to bound memory;
+    # bin 0 is background and bin n_labels + 1 collects out of range values
+    nx, ny, nz = volume.shape[:3]
+    bins = n_labels + 2
+    hist_x = np.zeros(nx * bins, np.int64)
+    hist_yz = np.zeros(nz * ny * bins, np.int64)
+    for z in range(0, nz, slab):
+        rows = np.asarray(volume[:, :, z:z + slab]).reshape(nx, -1, order='F')  # one column per (y, z) row
+        labeled = np.count_nonzero(rows)
+        if not labeled:
+            continue
+        if labeled * 8 < rows.size:  # sparse slab, visit only the labeled voxels
+            flat = rows.ravel(order='F')
+            index = np.flatnonzero(flat)
+            values = np.clip(flat[index], 0, n_labels + 1).astype(np.intp)
+            row, x = np.divmod(index, nx)
+            hist_x += np.bincount(x * bins + values, minlength=hist_x.size)
+            hist_yz += np.bincount((z * ny + row) * bins + values, minlength=hist_yz.size)
+            continue
+        # dense slab, crop to the rows and x range that hold labels
+        occupied = np.flatnonzero(rows.any(axis=0))
+        columns = np.flatnonzero(rows[:, occupied].any(axis=1))
+        x0, x1 = columns[0], columns[-1] + 1
+        key = np.empty((x1 - x0, occupied.size), np.intp, order='F')
+        np.clip(rows[x0:x1, occupied], 0, n_labels + 1, out=key, casting='unsafe')
+        hist_x += np.bincount((key + bins * np.arange(x0, x1)[:, None]).ravel(order='K'), minlength=hist_x.size)
+        key += bins * (z * ny + occupied)
+        hist_yz += np.bincount(key.ravel(order='K'), minlength=hist_yz.size)
+    hist_yz = hist_yz.reshape(nz, ny, bins)
+    return hist_x.reshape(nx, bins), hist_yz.sum(axis=0), hist_yz.sum(axis=1)
+
+
+def compute_label_statistics(volume, n_labels, spacing, origin=(0.0, 0.0, 0.0)):
+    # voxel count, volume (mm^3), world centroid and voxel bounds of labels 1..n_labels in an [x, y, z] volume
+    histograms = [hist[:, 1:n_labels + 1].T for hist in label_histograms(volume, n_labels)]  # [label, index]
+    counts = histograms[0].sum(axis=1)
+    centroids, lows, highs = [], [], []
+    for axis, hist in enumerate(histograms):
+        size = hist.shape[1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_index = hist.dot(np.arange(size)) / counts
+        centroids.append(origin[axis] + mean_index * spacing[axis])
+        present = hist > 0
+        lows.append(present.argmax(axis=1))
+        highs.append(size - 1 - present[:, ::-1].argmax(axis=1))
+
+    voxel_volume = spacing[0] * spacing[1] * spacing[2]
+    statistics = []
+    for i in range(n_labels):
+        count = int(counts[i])
+        statistics.append({
+            'label': i + 1,
+            'voxels': count,
+            'volume': count * voxel_volume,
+            'centroid': tuple(float(c[i]) for c in centroids) if count else None,
+            'bounds': tuple(int(b[i]) for axis in zip(lows, highs) for b in axis) if count else None,
+        })
+    return statistics
+
+
+def compute_mask_statistics(mask, n_labels):
+    # always at full resolution: a mask shown from a pyramid level is streamed from its file instead
+    if mask.pyramid is not None:
+        zooms = nib.load(mask.file).header.get_zooms()[:3]
+        return compute_label_statistics(mask.pyramid[0], n_labels, zooms)
+    image = mask.reader.GetOutput()
+    extent = image.GetExtent()
+    origin = [image.GetOrigin()[i] + extent[2 * i] * image.GetSpacing()[i] for i in range(3)]
+    return compute_label_statistics(image_to_array(image).T, n_labels, image.GetSpacing(), origin)
+
+
+def write_label_statistics(file_name, statistics):
+    with open(file_name, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['label', 'voxels', 'volume_mm3', 'centroid_x', 'centroid_y', 'centroid_z',
+                         'x_min', 'x_max', 'y_min', 'y_max', 'z_min', 'z_max'])
+        for stats in statistics:
+            centroid = ['{:.3f}'.format(c) for c in stats['centroid']] if stats['centroid'] else [''] * 3
+            bounds = list(stats['bounds']) if stats['bounds'] else [''] * 6
+            writer.writerow([stats['label'], stats['voxels'], '{:.3f}'.format(stats['volume'])] + centroid + bounds)
+
+
+def get_label_locator(label):
+    # built on first use and rebuilt only after the mesh is regenerated (threshold or smoothness changes)
+    mesh = label.actor.GetMapper().GetInput()
+    if label.locator is None or mesh.GetMTime() > label.locator_time:
+        label.locator = vtk.vtkStaticCellLocator()
+        label.locator.SetDataSet(mesh)
+        label.locator.BuildLocator()
+        label.locator_time = mesh.GetMTime()
+    return label.locator
+
+
+def intersect_label(label, p0, p1):
+    # parametric distance along p0 -> p1 and the hit point, or None
+    t, x, pcoords = vtk.reference(0.0), [0.0, 0.0, 0.0], [0.0, 0.0, 0.0]
+    sub_id, cell_id = vtk.reference(0), vtk.reference(0)
+    if get_label_locator(label).IntersectWithLine(p0, p1, 0.0001, t, x, pcoords, sub_id, cell_id):
+        return float(t), x
+    return None
+
+
+def probe_voxel(nii_object, world_point):
+    # full resolution (x, y, z) voxel index under world_point and its scalar value at the loaded level, or None outside
+    image = nii_object.reader.GetOutput()
+    origin, spacing, extent = image.GetOrigin(), image.GetSpacing(), image.GetExtent()
+    index = [int(round((world_point[i] - origin[i]) / spacing[i])) for i in range(3)]
+    if any(index[i] < extent[2 * i] or index[i] > extent[2 * i + 1] for i in range(3)):
+        return None
+    value = image_to_array(image)[index[2] - extent[4], index[1] - extent[2], index[0] - extent[0]]
+    return tuple(i * 2 ** nii_object.level for i in index), value.item()
+
+
+def prune_mask(mask, n_labels):
+    # drop small or surplus components of every label once, into one uchar volume shared by all mask extractors
+    image = mask.reader.GetOutput()
+    pruned = np.zeros(image_to_array(image).shape, dtype=np.uint8)
+    for label_value in range(1, n_labels + 1):
+        connectivity = vtk.vtkImageConnectivityFilter()
+        connectivity.SetInputData(image)
+        connectivity.SetScalarRange(label_value, label_value)
+        connectivity.SetSizeRange(max(MASK_MIN_REGION_VOXELS, 1), connectivity.GetSizeRange()[1])
+        connectivity.SetExtractionModeToAllRegions()
+        if MASK_MAX_REGIONS:
+            connectivity.SetLabelModeToSizeRank()  # largest region is 1
+            connectivity.SetLabelScalarTypeToUnsignedShort()
+        else:
+            connectivity.SetLabelModeToConstantValue()
+            connectivity.SetLabelConstantValue(1)
+            connectivity.SetLabelScalarTypeToUnsignedChar()
+        connectivity.Update()
+        regions = image_to_array(connectivity.GetOutput())
+        if MASK_MAX_REGIONS:
+            pruned[regions - 1 < MASK_MAX_REGIONS] = label_value  # background 0 wraps around and is not kept
+        else:
+            pruned[regions.view(np.bool_)] = label_value
+        del regions
+        connectivity.GetOutput().ReleaseData()
+
+    mask.pruned = import_volume(pruned.T, spacing=image.GetSpacing(), origin=image.GetOrigin())
+
+
+def mask_footprint_bytes():
+    # per voxel bytes pruning adds to the mask: the shared volume, the connectivity output and a selection mask
+    if not (MASK_MIN_REGION_VOXELS or MASK_MAX_REGIONS):
+        return 0
+    return 1 + (2 if MASK_MAX_REGIONS else 1) + 1
+
+
+def create_surface_pruner(extractor, min_cells, max_regions):
+    # triangle level connectivity for the liver, so threshold changes never copy or rescan the volume
+    connectivity = vtk.vtkPolyDataConnectivityFilter()
+    connectivity.ReleaseDataFlagOn()
+    pruner = vtk.vtkProgrammableFilter()
+    pruner.SetInputConnection(extractor.GetOutputPort())
+
+    def prune():
+        connectivity.SetInputData(pruner.GetPolyDataInput())
+        connectivity.SetExtractionModeToAllRegions()
+        connectivity.Update()
+        sizes = numpy_support.vtk_to_numpy(connectivity.GetRegionSizes())
+        order = np.argsort(sizes)[::-1]
+        keep = order[sizes[order] >= min_cells][:max_regions or None]
+        connectivity.SetExtractionModeToSpecifiedRegions()
+        connectivity.InitializeSpecifiedRegionList()
+        for region_id in keep:
+            connectivity.AddSpecifiedRegion(int(region_id))
+        connectivity.Update()
+        pruner.GetPolyDataOutput().ShallowCopy(connectivity.GetOutput())
+
+    pruner.SetExecuteMethod(prune)
+    return pruner
+
+
 def create_liver_extractor(liver):
    
     liver_extractor = vtk.vtkFlyingEdges3D()
     liver_extractor.SetInputConnection(liver.reader.GetOutputPort())
     # liver_extractor.SetValue(0, sum(liver.scalar_range)/2)
+    if LIVER_MIN_REGION_CELLS or LIVER_MAX_REGIONS:
+        liver.labels[0].pruner = create_surface_pruner(liver_extractor, LIVER_MIN_REGION_CELLS, LIVER_MAX_REGIONS)
     return liver_extractor
 
 
 def create_mask_extractor(mask):
    
     mask_extractor = vtk.vtkDiscreteMarchingCubes()
-    mask_extractor.SetInputConnection(mask.reader.GetOutputPort())
+    mask_extractor.SetInputConnection((mask.pruned if mask.pruned is not None else mask.reader).GetOutputPort())
     return mask_extractor
 
 
@@ -121,7 +492,8 @@ def add_surface_rendering(nii_object, label_idx, label_value):
 
     # if the cell size is 0 then there is no label_idx data
     if nii_object.labels[label_idx].extractor.GetOutput().GetMaxCellSize():
-        reducer = create_polygon_reducer(nii_object.labels[label_idx].extractor)
+        label = nii_object.labels[label_idx]
+        reducer = create_polygon_reducer(label.pruner if label.pruner is not None else label.extractor)
         smoother = create_smoother(reducer, nii_object.labels[label_idx].smoothness)
         normals = create_normals(smoother)
         actor_mapper = create_mapper(normals)
@@ -171,6 +543,54 @@ def setup_slicer(renderer, liver):
     return [axial, coronal, sagittal]
 
 
+def clip_extent(extent, bounds):
+    return [min(max(extent[i], bounds[i - i % 2]), bounds[i - i % 2 + 1]) for i in range(6)]
+
+
+def setup_mask_overlay(renderer, mask, slicer_props):
+    # only the displayed slice of the mask is color mapped; a vtkImageStack keeps the coincident slices from z-fighting
+    lut = create_mask_table()
+    overlays = []
+    for slicer_prop, axis in zip(slicer_props, (2, 1, 0)):  # axial, coronal, sagittal
+        extent = clip_extent(slicer_prop.GetDisplayExtent(), mask.extent)
+        voi = vtk.vtkExtractVOI()
+        voi.SetInputConnection(mask.reader.GetOutputPort())
+        voi.SetVOI(extent)  # never leave the default VOI, which is the whole volume
+
+        colors = vtk.vtkImageMapToColors()
+        colors.SetInputConnection(voi.GetOutputPort())
+        colors.SetLookupTable(lut)
+
+        overlay = vtk.vtkImageActor()
+        overlay.GetMapper().SetInputConnection(colors.GetOutputPort())
+        overlay.SetDisplayExtent(extent)
+        overlay.InterpolateOff()  # label colors must not blend into each other
+        overlay.GetProperty().SetOpacity(0)
+        overlay.GetProperty().SetLayerNumber(1)
+
+        stack = vtk.vtkImageStack()
+        renderer.RemoveActor(slicer_prop)
+        stack.AddImage(slicer_prop)
+        stack.AddImage(overlay)
+        stack.SetActiveLayer(0)
+        renderer.AddViewProp(stack)
+        overlays.append((voi, overlay, axis))
+        set_overlay_slice(overlays[-1], slicer_prop.GetDisplayExtent(), mask.extent)
+    return overlays, lut
+
+
+def set_overlay_slice(overlay, extent, mask_extent):
+    # hide the overlay rather than show the mask's border slice when the slice lies outside the mask
+    voi, actor, axis = overlay
+    if not mask_extent[2 * axis] <= extent[2 * axis] <= mask_extent[2 * axis + 1]:
+        actor.SetVisibility(0)
+        return
+    extent = clip_extent(extent, mask_extent)
+    voi.SetVOI(extent)
+    actor.SetDisplayExtent(extent)
+    actor.SetVisibility(1)
+
+
 def setup_projection(liver, renderer):
     slice_mapper = vtk.vtkImageResliceMapper()
     slice_mapper.SetInputConnection(liver.reader.GetOutputPort())
@@ -189,10 +609,9 @@ def setup_projection(liver, renderer):
     return liver_image_prop
 
 
-def setup_liver(renderer, file):
+def setup_liver(renderer, source, affine=None, level=0):
     liver = NiiObject()
-    liver.file = file
-    liver.reader = read_volume(liver.file)
+    load_volume(liver, source, affine, level)
     liver.labels.append(NiiLabel(liver_COLORS[0], liver_OPACITY, liver_SMOOTHNESS))
     liver.labels[0].extractor = create_liver_extractor(liver)
     liver.extent = liver.reader.GetDataExtent()
@@ -217,16 +636,19 @@ def setup_liver(renderer, file):
     return liver
 
 
-def setup_mask(renderer, file):
+def setup_mask(renderer, source, affine=None, level=0):
     mask = NiiObject()
-    mask.file = file
-    mask.reader = read_volume(mask.file)
+    load_volume(mask, source, affine, level, labels=True)
     mask.extent = mask.reader.GetDataExtent()
     n_labels = int(mask.reader.GetOutput().GetScalarRange()[1])
     n_labels = n_labels if n_labels <= 10 else 10
+    statistics = compute_mask_statistics(mask, n_labels)
+    if MASK_MIN_REGION_VOXELS or MASK_MAX_REGIONS:
+        prune_mask(mask, n_labels)
 
     for label_idx in range(n_labels):
         mask.labels.append(NiiLabel(MASK_COLORS[label_idx], MASK_OPACITY, MASK_SMOOTHNESS))
+        mask.labels[label_idx].statistics = statistics[label_idx]
         mask.labels[label_idx].extractor = create_mask_extractor(mask)
         add_surface_rendering(mask, label_idx, label_idx + 1)
         renderer.AddActor(mask.labels[label_idx].actor)